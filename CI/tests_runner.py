@@ -16,6 +16,10 @@ import yaml
 # Environment variable indicating we are running on a CI server and should tweak some parameters
 CI_ENV_VARIABLE = os.environ.get('PIPELINE_WORKSPACE')
 
+# Looks for the started editor among all the system processes (ps) so it could be confused by the editors launched by
+# the other test workers. Run it alone after the parallel pass
+SERIAL_TEST = 'tests/test_unit.py::TestUnit::test_start_editor'
+
 
 if __name__ == '__main__':
     lockfile = yaml.safe_load(Path(__file__).parent.joinpath('lockfile.yml').read_text())['variables']
@@ -29,10 +33,14 @@ if __name__ == '__main__':
         print(f"Test case: {case}", flush=True)
         print('========================================', flush=True)
         os.environ['STM32PIO_TEST_CASE'] = case
-        # On Linux also form code coverage report
+        # On Linux also form code coverage report. Tests are distributed over the worker processes (pytest-xdist),
+        # each of them has its own temp stage folder (see tests/common.py). Test files are kept whole on a single
+        # worker so the integration tests share the generated project cache (see generate_and_pio_init())
         if platform.system() == 'Linux':
-            args = ['pytest', 'tests', '--junitxml=junit/test-results.xml', '--cov=stm32pio/core', '--cov=stm32pio/cli',
-                    '--cov-branch', '--cov-report=xml']
+            coverage_args = ['--cov=stm32pio/core', '--cov=stm32pio/cli', '--cov-branch', '--cov-report=xml']
+            subprocess.run(['pytest', 'tests', '-n', 'auto', '--dist', 'loadfile', f'--deselect={SERIAL_TEST}',
+                            '--junitxml=junit/test-results.xml'] + coverage_args)
+            subprocess.run(['pytest', SERIAL_TEST, '-p', 'no:xdist', '--junitxml=junit/test-results-serial.xml',
+                            '--cov-append'] + coverage_args)
         else:
-            args = ['python', '-m', 'unittest', '-b', '-v']
-        subprocess.run(args)
+            subprocess.run(['python', '-m', 'unittest', '-b', '-v'])
@@ -6,6 +6,7 @@ import logging
 import shutil
 import subprocess
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List
 
@@ -59,13 +60,30 @@ class DefaultStrategyI(ICleanStrategy):
                     elif reply.lower() in stm32pio.core.settings.no_options:
                         return
 
+            log_deletions = self.logger.isEnabledFor(logging.DEBUG)  # don't format messages nobody will see
+
+            # The list is fully unfolded but a folder is removed together with all its content so only the "topmost"
+            # entries should be actually handled
+            removal_set = set(removal_list)
+            folders, files = [], []
             for entry in removal_list:
-                if entry.is_dir():
-                    shutil.rmtree(entry)  # this can delete non-empty directories
-                    self.logger.debug(f'del "{entry.relative_to(self.path)}"/')
-                elif entry.is_file():
-                    entry.unlink()
-                    self.logger.debug(f'del "{entry.relative_to(self.path)}"')
+                if entry.parent not in removal_set:
+                    if entry.is_dir():
+                        folders.append(entry)
+                    elif entry.is_file():
+                        files.append(entry)
+
+            if len(folders):
+                # Subtrees are independent so their removal (I/O-bound) can be done concurrently
+                with ThreadPoolExecutor(max_workers=min(8, len(folders))) as executor:
+                    # this can delete non-empty directories. Iterating over results also re-raises possible errors
+                    for folder, _ in zip(folders, executor.map(shutil.rmtree, folders)):
+                        if log_deletions:
+                            self.logger.debug(f'del "{folder.relative_to(self.path)}"/')
+            for file in files:
+                file.unlink()
+                if log_deletions:
+                    self.logger.debug(f'del "{file.relative_to(self.path)}"')
             self.logger.info("project has been cleaned")
         else:
             self.logger.info("no files/folders to remove")
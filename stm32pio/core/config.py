@@ -107,8 +107,14 @@ class ProjectConfig(ConfigParser):
         """
         if isinstance(another, Path):
             temp_config = ConfigParser(interpolation=None)
-            temp_config.read(another)
-            temp_config_dict_cleaned = stm32pio.core.util.cleanup_mapping(temp_config)
+            if not temp_config.read(another):
+                return  # no such file, nothing to merge with
+            # Take a plain dict snapshot once instead of walking the ConfigParser mapping protocol (every value access
+            # goes through the section proxies) both here and in _log_whats_changed()
+            temp_config_dict = {section: dict(temp_config.items(section, raw=True))
+                                for section in temp_config.sections()}
+            temp_config_dict[temp_config.default_section] = dict(temp_config.defaults())
+            temp_config_dict_cleaned = stm32pio.core.util.cleanup_mapping(temp_config_dict)
             self._log_whats_changed(temp_config_dict_cleaned, reason=reason,
                                     log_string=f"these config parameters will be overridden by {another}")
             self.read_dict(temp_config_dict_cleaned)
@@ -69,6 +69,9 @@ class ProjectLogger(logging.LoggerAdapter):
     def process(self, msg: Any, kwargs: MutableMapping[str, Any]) -> Tuple[Any, MutableMapping[str, Any]]:
         """Inject a context data (both from the adapter and the log call)"""
 
+        if not kwargs:  # the most common case: a plain logging call, nothing to merge
+            return msg, dict(extra=copy(self.extra))  # don't share the adapter's dictionary with the records
+
         # 1. Attach the common, per-project-scoped context
         if 'extra' in kwargs:
             kwargs['extra'].update(self.extra)
@@ -6,12 +6,13 @@ possible import confusions with the real ``platformio.py`` package.
 import json
 import logging
 import subprocess
+import threading
 import configparser
 from copy import copy
 from io import StringIO
 from pathlib import Path
 from time import time
-from typing import List
+from typing import Dict, List, Tuple
 
 import stm32pio.core.log
 import stm32pio.core.settings
@@ -214,11 +215,13 @@ class PlatformIO:
         return process.returncode
 
 
-_pio_boards_cache: List[str] = []
-_pio_boards_cache_fetched_at: float = 0
+# Boards lists are cached per PlatformIO command (different executables can potentially have different sets of boards).
+# Maps the command to the (fetched_at_timestamp, boards_list) tuple
+_pio_boards_cache: Dict[str, Tuple[float, List[str]]] = {}
+# Prevents running several identical 'platformio boards' processes at once when requested from multiple threads
+_pio_boards_cache_lock = threading.Lock()
 
 
-# TODO: probably some lock should be acquired preventing of more than 1 execution at a time (e.g. from threads)
 # Is there some std lib implementation of temp cache? No, look at 3rd-party alternative, just like lru_cache:
 # https://github.com/tkem/cachetools
 def get_boards(platformio_cmd: str = stm32pio.core.settings.config_default['app']['platformio_cmd']) -> List[str]:
@@ -233,18 +236,17 @@ def get_boards(platformio_cmd: str = stm32pio.core.settings.config_default['app'
     :return: list of STM32 PlatformIO boards codes
     """
 
-    global _pio_boards_cache_fetched_at, _pio_boards_cache
+    with _pio_boards_cache_lock:
+        fetched_at, boards = _pio_boards_cache.get(platformio_cmd, (0.0, []))
+        current_time = time()
+        cache_is_outdated = current_time - fetched_at >= stm32pio.core.settings.pio_boards_cache_lifetime
 
-    cache_is_empty = len(_pio_boards_cache) == 0
-    current_time = time()
-    cache_is_outdated = current_time - _pio_boards_cache_fetched_at >= stm32pio.core.settings.pio_boards_cache_lifetime
-
-    if cache_is_empty or cache_is_outdated:
-        process = subprocess.run([platformio_cmd, 'boards', '--json-output', 'stm32cube'],
-                                 stdout=subprocess.PIPE, check=True)
-        _pio_boards_cache = [board['id'] for board in json.loads(process.stdout)]
-        _pio_boards_cache_fetched_at = current_time
+        if len(boards) == 0 or cache_is_outdated:
+            process = subprocess.run([platformio_cmd, 'boards', '--json-output', 'stm32cube'],
+                                     stdout=subprocess.PIPE, check=True)
+            boards = [board['id'] for board in json.loads(process.stdout)]
+            _pio_boards_cache[platformio_cmd] = (current_time, boards)
 
     # We don't know what a caller will ended up doing with that list. Simple copy is a sufficient solution for us since
     # copy(list[string]) basically equals deepcopy(list[string]) as strings are immutable in Python
-    return copy(_pio_boards_cache)
+    return copy(boards)
@@ -98,6 +98,10 @@ show_traceback_threshold_level = logging.DEBUG  # when log some error and need t
 
 pio_boards_cache_lifetime = 5.0  # in seconds
 
+# Max number of the log records held back for the single project in GUI (e.g. while its widgets are loading). The oldest
+# ones are dropped
+log_buffer_maxlen = 10000
+
 
 #
 # Do not distract end-user with this CI s**t, take out from the main dict definition above
@@ -6,6 +6,7 @@ can sit in and the logic to inspect them.
 import collections
 import contextlib
 import enum
+import os
 
 import stm32pio.core.project
 
@@ -51,6 +52,30 @@ _stages_string_representations = {
 }
 
 
+def _is_non_empty_dir(path: str) -> bool:
+    return os.path.isdir(path) and len(os.listdir(path)) > 0
+
+
+def _contains_firmware(path: str) -> bool:
+    """
+    Look for any '*firmware*' file inside the given tree. Unlike ``Path.rglob()`` + ``Path.is_file()``, ``os.scandir()``
+    entries come with the file type already known from the directory listing on most systems, so no additional stat()
+    call is performed per entry. Stops at the first match
+    """
+    folders_to_visit = [path]
+    while folders_to_visit:
+        try:
+            with os.scandir(folders_to_visit.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        folders_to_visit.append(entry.path)
+                    elif 'firmware' in entry.name and entry.is_file():
+                        return True
+        except OSError:  # e.g. the folder doesn't exist or has been removed meanwhile
+            continue
+    return False
+
+
 # TODO: 3.6+ CPython, 3.7+ language-wise: dicts are insertion ordered already
 class ProjectState(collections.OrderedDict):
 
@@ -82,31 +107,29 @@ class ProjectState(collections.OrderedDict):
             with contextlib.suppress(Exception):
                 platformio_ini_is_patched = project.platformio.ini.is_patched
 
-        inc_dir = project.path / 'Inc'
-        src_dir = project.path / 'Src'
-        include_dir = project.path / 'include'
-        pio_dir = project.path / '.pio'  # hidden PlatformIO per-project-based service folder
+        # The state is evaluated often (e.g. GUI refreshes it after every action) so use plain strings and os.path
+        # functions here – they are thin wrappers around stat() without constructing intermediate Path objects
+        project_dir = str(project.path)
+        inc_dir = os.path.join(project_dir, 'Inc')
+        src_dir = os.path.join(project_dir, 'Src')
+        include_dir = os.path.join(project_dir, 'include')
+        pio_dir = os.path.join(project_dir, '.pio')  # hidden PlatformIO per-project-based service folder
 
         #
         # 2. For each ProjectStage define the criteria a project should met to be considered fulfilling this particular
-        # stage
+        # stage. Conditions are combined with short-circuiting operators and stored as the final boolean values right
+        # away, so nothing is evaluated needlessly and no separate folding pass is required
         #
-        self[ProjectStage.UNDEFINED] = [True]  # always satisfied, see ProjectStage.UNDEFINED description
-        self[ProjectStage.EMPTY] = [project.cubemx.ioc.path.is_file()]  # IOC file is present
-        self[ProjectStage.INITIALIZED] = [project.config.path.is_file()]  # stm32pio.ini config file has been saved
-        self[ProjectStage.GENERATED] = [inc_dir.is_dir() and len(list(inc_dir.iterdir())),
-                                        src_dir.is_dir() and len(list(src_dir.iterdir()))]  # code has been generated
-        self[ProjectStage.PIO_INITIALIZED] = [pio_is_initialized]  # platformio.ini file is present
+        self[ProjectStage.UNDEFINED] = True  # always satisfied, see ProjectStage.UNDEFINED description
+        self[ProjectStage.EMPTY] = os.path.isfile(project.cubemx.ioc.path)  # IOC file is present
+        self[ProjectStage.INITIALIZED] = os.path.isfile(project.config.path)  # stm32pio.ini config file has been saved
+        self[ProjectStage.GENERATED] = (_is_non_empty_dir(inc_dir) and
+                                        _is_non_empty_dir(src_dir))  # code has been generated
+        self[ProjectStage.PIO_INITIALIZED] = pio_is_initialized  # platformio.ini file is present
         # Analyze platformio.ini file and look for junk folders
-        self[ProjectStage.PATCHED] = [platformio_ini_is_patched, not include_dir.exists()]
+        self[ProjectStage.PATCHED] = platformio_ini_is_patched and not os.path.exists(include_dir)
         # Search for a build artifacts
-        self[ProjectStage.BUILT] = [pio_dir.is_dir() and any(item.is_file() for item in pio_dir.rglob('*firmware*'))]
-
-        #
-        # 3. Evaluate and fold all conditions above to take the final form
-        #
-        for stage, conditions in self.items():
-            self[stage] = all(conditions)
+        self[ProjectStage.BUILT] = _contains_firmware(pio_dir)
 
     def __str__(self):
         """Pretty human-readable representation (doesn't include the UNDEFINED service stage)"""
@@ -122,12 +122,18 @@ def run_command(command: str, path: Path, logger: 'stm32pio.core.log.Logger') ->
 
     logger.info(f"starting '{executable_name}'...")
     try:
-        with stm32pio.core.log.LogPipe(logger, logging.DEBUG) as log:
-            # Works unstable on some Windows 7 systems, but correct on Win10...
-            # result = subprocess.run([command, self.path], check=True)
+        # Works unstable on some Windows 7 systems, but correct on Win10...
+        # result = subprocess.run([command, self.path], check=True)
+        if logger.isEnabledFor(logging.DEBUG):
+            with stm32pio.core.log.LogPipe(logger, logging.DEBUG) as log:
+                completed_process = subprocess.run(f'{sanitized_input} "{path}"', shell=True, check=True,
+                                                   stdout=log.pipe, stderr=log.pipe)
+            logger.debug(completed_process.stdout, from_subprocess=True)
+        else:
+            # The output would be dropped by the logger anyway so let the OS discard it right away instead of pumping
+            # it through the pipe and the reader thread
             completed_process = subprocess.run(f'{sanitized_input} "{path}"', shell=True, check=True,
-                                               stdout=log.pipe, stderr=log.pipe)
-        logger.debug(completed_process.stdout, from_subprocess=True)
+                                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
         return completed_process.returncode
     except subprocess.CalledProcessError as e:
@@ -144,11 +150,12 @@ def extract_header_comment(text: str, comment_symbol: str = '#') -> str:
     :return: header comment
     """
 
-    header_comment = ''
-    if text.startswith(comment_symbol):
-        for line in text.splitlines(keepends=True):
-            if line.startswith(comment_symbol):
-                header_comment += line
-            else:
-                break
-    return header_comment
+    # Walk only the leading lines instead of splitting the whole (possibly large) text
+    header_lines = []
+    line_start = 0
+    while text.startswith(comment_symbol, line_start):
+        line_end = text.find('\n', line_start)
+        line_end = len(text) if line_end == -1 else line_end + 1
+        header_lines.append(text[line_start:line_end])
+        line_start = line_end
+    return ''.join(header_lines)
@@ -2,8 +2,11 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import gc
 import inspect
+import json
 import logging
+import os
 import pathlib
 import platform
 import sys
@@ -13,7 +16,7 @@ import stm32pio.core.pio
 
 try:
     from PySide2.QtCore import Signal, QtInfoMsg, QtWarningMsg, QtCriticalMsg, QtFatalMsg, qInstallMessageHandler, \
-        QStringListModel, QUrl, QThreadPool, QSettings, QByteArray
+        QStringListModel, QUrl, QSettings, QByteArray, QStandardPaths
     # PySide environment is slightly different among OSes
     if platform.system() == 'Linux':
         from PySide2.QtWidgets import QApplication
@@ -44,7 +47,7 @@ except ModuleNotFoundError:
     import stm32pio.core.state
 
 from stm32pio.gui.settings import init_settings, Settings
-from stm32pio.gui.util import Worker
+from stm32pio.gui.util import Worker, WorkerSignals, init_workers_pool
 from stm32pio.gui.log import setup_logging, module_logger
 from stm32pio.gui.list import ProjectsList
 from stm32pio.gui.project import ProjectListItem
@@ -64,11 +67,40 @@ def parse_args(args: list) -> Optional[argparse.Namespace]:
     return parser.parse_args(args) if len(args) else None
 
 
+def _boards_cache_file() -> pathlib.Path:
+    return pathlib.Path(QStandardPaths.writableLocation(QStandardPaths.CacheLocation)) / 'boards.json'
+
+
+def load_boards_cache() -> Optional[List[str]]:
+    """PlatformIO boards list saved on the previous app launch (see update_boards_cache()), if any"""
+    try:
+        return json.loads(_boards_cache_file().read_text())
+    except (OSError, ValueError):
+        return None  # no cache yet or it is corrupted
+
+
+def update_boards_cache(
+        platformio_cmd: str = stm32pio.core.settings.config_default['app']['platformio_cmd']) -> List[str]:
+    """Get the actual PlatformIO boards list and save it on disk so the next app launch can use it right away"""
+    boards = stm32pio.core.pio.get_boards(platformio_cmd)
+    cache_file = _boards_cache_file()
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = cache_file.with_suffix('.tmp')
+        temp_file.write_text(json.dumps(boards))
+        os.replace(str(temp_file), str(cache_file))  # readers never see a partially written file
+    except OSError as e:
+        module_logger.warning(f"cannot save PlatformIO boards cache: {e}")
+    return boards
+
+
 def create_app(sys_argv: List[str] = None) -> QApplicationClass:
     if sys_argv is None:
         sys_argv = sys.argv[1:]
 
     args = parse_args(sys_argv)
+    # Normalize once, it is used later in the loaded() callback
+    cli_path = os.path.abspath(os.path.expanduser(args.path)) if args is not None and 'path' in args else None
 
     app = QApplicationClass(sys.argv)
 
@@ -78,18 +110,17 @@ def create_app(sys_argv: List[str] = None) -> QApplicationClass:
     app.setWindowIcon(QIcon(str(MODULE_PATH.joinpath('icons/icon.svg'))))
 
     settings = init_settings(app)
+    pool = init_workers_pool(app)
 
-    setup_logging(initial_verbosity=settings.get('verbose'))
+    console_log_listener = setup_logging(initial_verbosity=settings.get('verbose'))
+    app.aboutToQuit.connect(console_log_listener.stop)  # flush the remaining console records
 
-    # Restore projects list
+    # Restore projects list (read in the loading thread, see below)
     # TODO: Qt pollutes a system leaving its files across several folders, right? We should probably inform a user
-    settings.beginGroup('app')
     restored_projects_paths: List[str] = []
-    for index in range(settings.beginReadArray('projects')):
-        settings.setArrayIndex(index)
-        restored_projects_paths.append(settings.value('path'))
-    settings.endArray()
-    settings.endGroup()
+    loaded_boards: List[str] = []  # same as above, the model itself should be touched from the main thread only
+    refreshed_boards: List[str] = []
+    boards_need_refresh: List[bool] = []  # non-empty when the boards have been served from the cache
 
     engine = QQmlApplicationEngine(parent=app)
 
@@ -99,56 +130,53 @@ def create_app(sys_argv: List[str] = None) -> QApplicationClass:
     projects_model = ProjectsList(parent=engine)
     boards_model = QStringListModel(parent=engine)
 
-    # Convert to QML-compatible format
-    project_stages = { stage.name: str(stage) for stage in stm32pio.core.state.ProjectStage }
-
-    # Fake stages: these are not present in the original enum of possible states
-    project_stages['LOADING'] = 'Loading...'
-    project_stages['INIT_ERROR'] = 'Initialization error'
-
-    root_path = ('/' + str(ROOT_PATH).replace('\\', '/')) if platform.system() == 'Windows' else str(ROOT_PATH)
-
-    # TODO: use setContextProperties() (see in Qt6, not present in Qt5...)
-    engine.rootContext().setContextProperty('appVersion', stm32pio.core.util.get_version())
-    engine.rootContext().setContextProperty('rootPath', root_path)
-    engine.rootContext().setContextProperty('Logging', stm32pio.core.log.logging_levels)
-    engine.rootContext().setContextProperty(stm32pio.core.state.ProjectStage.__name__, project_stages)
-    engine.rootContext().setContextProperty('projectsModel', projects_model)
-    engine.rootContext().setContextProperty('boardsModel', boards_model)
-    engine.rootContext().setContextProperty('settings', settings)
-
-    engine.load(QUrl.fromLocalFile(str(MODULE_PATH/'qml'/'App.qml')))
-
-    main_window = engine.rootObjects()[0]  # only child
-    app.aboutToQuit.connect(main_window.close)  # Qt.quit() can now be successfully used
-
-    def onClose():
-        print('Closing...')
-        for project in projects_model.projects:
-            project.should_be_destroyed.set()
-    main_window.closing.connect(onClose)
-
     # Getting PlatformIO boards can take a long time when the PlatformIO cache is outdated but it is important to have
     # them before the projects list is restored, so we start a dedicated loading thread. We actually can add other
     # start-up operations here if there will be a need to. Use the same Worker class to spawn the thread at the pool
     # TODO: this uses default platformio command but it might be unavailable.
-    #  Also, it unnecessarily slows down the startup
+    #  Also, it slows down the first startup (the subsequent ones use the cached list)
     def loading():
-        boards = ['None'] + stm32pio.core.pio.get_boards()
-        boards_model.setStringList(boards)
+        # QSettings instance shouldn't be shared between the threads, but different ones can be used simultaneously.
+        # Empty defaults so nothing is written
+        restored_projects_paths.extend(Settings(prefix=settings.prefix, defaults={}).get_projects_paths())
+
+        boards = load_boards_cache()
+        if boards is None:
+            boards = update_boards_cache()  # have to wait for the PlatformIO this time
+        else:
+            # Serve the list from the previous launch right away and refresh it in background (see loaded())
+            boards_need_refresh.append(True)
+        loaded_boards.extend(['None'] + boards)
+
+    def refreshing():
+        refreshed_boards.extend(['None'] + update_boards_cache())
+
+    def refreshed(action_name: str, success: bool):
+        # Main thread. Resetting the model drops the current selections of the ComboBoxes so do it only when needed
+        if success and refreshed_boards != boards_model.stringList():
+            boards_model.setStringList(refreshed_boards)
 
     def loaded(action_name: str, success: bool):
+        boards_model.setStringList(loaded_boards if len(loaded_boards) else ['None'])
+        if len(boards_need_refresh):
+            pool.start(boards_refresher)  # not earlier so the refreshed list cannot be overwritten by the cached one
+
         try:
-            # Qt objects cannot be parented from the different thread so we restore the projects list in the main thread
-            for path in restored_projects_paths:
-                projects_model.addListItem(path, list_item_kwargs={ 'from_startup': True })
+            # Qt objects cannot be parented from the different thread so we restore the projects list in the main
+            # thread. Lots of long-living objects are created here in a row so there is no point in the garbage
+            # collector passes triggered meanwhile
+            gc.disable()
+            try:
+                projects_model.addListItems(restored_projects_paths, list_item_kwargs={ 'from_startup': True })
+            finally:
+                gc.enable()
 
             # At the end, append (or jump to) a CLI-provided project, if there is one
-            if args is not None and 'path' in args:
+            if cli_path is not None:
                 list_item_kwargs = { 'from_startup': True }
                 if args.board:  # TODO: test this
                     list_item_kwargs['project_kwargs'] = { 'parameters': { 'project': { 'board': args.board } } }  # pizdec konechno...
-                projects_model.addListItem(str(pathlib.Path(args.path)), list_item_kwargs=list_item_kwargs)
+                projects_model.addListItem(cli_path, list_item_kwargs=list_item_kwargs)
                 # Append always happens to the end of list and we want to jump to the last added project (CLI one). The
                 # resulting length of the list is (len(restored_projects_paths) + 1) so the last index is that minus 1
                 projects_model.goToProject.emit((len(restored_projects_paths) + 1) - 1)
@@ -160,9 +188,38 @@ def create_app(sys_argv: List[str] = None) -> QApplicationClass:
         main_window.backendLoaded.emit(success)  # inform the GUI
         print('stm32pio GUI started')
 
-    loader = Worker(loading, logger=module_logger, parent=app)
-    loader.finished.connect(loaded)
-    QThreadPool.globalInstance().start(loader)
+    # Start loading right away so it runs concurrently with the QML engine loading below. 'loaded' is queued to the
+    # main thread event loop (i.e. runs after create_app() has returned) so the main window is there already
+    boards_refresher = Worker(refreshing, logger=module_logger, signals=WorkerSignals(parent=app))
+    boards_refresher.signals.finished.connect(refreshed)
+    loader = Worker(loading, logger=module_logger, signals=WorkerSignals(parent=app))
+    loader.signals.finished.connect(loaded)
+    pool.start(loader)
+
+    # Convert to QML-compatible format
+    project_stages = { stage.name: str(stage) for stage in stm32pio.core.state.ProjectStage }
+
+    # Fake stages: these are not present in the original enum of possible states
+    project_stages['LOADING'] = 'Loading...'
+    project_stages['INIT_ERROR'] = 'Initialization error'
+
+    root_path = ('/' + str(ROOT_PATH).replace('\\', '/')) if platform.system() == 'Windows' else str(ROOT_PATH)
+
+    # TODO: use setContextProperties() (see in Qt6, not present in Qt5...)
+    engine.rootContext().setContextProperty('appVersion', stm32pio.core.util.get_version())
+    engine.rootContext().setContextProperty('rootPath', root_path)
+    engine.rootContext().setContextProperty('Logging', stm32pio.core.log.logging_levels)
+    engine.rootContext().setContextProperty(stm32pio.core.state.ProjectStage.__name__, project_stages)
+    engine.rootContext().setContextProperty('projectsModel', projects_model)
+    engine.rootContext().setContextProperty('boardsModel', boards_model)
+    engine.rootContext().setContextProperty('settings', settings)
+
+    engine.load(QUrl.fromLocalFile(str(MODULE_PATH/'qml'/'App.qml')))
+
+    main_window = engine.rootObjects()[0]  # only child
+    app.aboutToQuit.connect(main_window.close)  # Qt.quit() can now be successfully used
+
+    main_window.closing.connect(lambda: print('Closing...'))
 
     return app
 
@@ -1,13 +1,13 @@
-import pathlib
-import time
-from typing import List, Iterator, Mapping, Any
+import platform
+import urllib.parse
+from typing import List, Mapping, Any, Dict, Optional, Tuple
 
 from PySide2.QtCore import QAbstractListModel, Signal, Slot, QObject, QThreadPool, QModelIndex, Qt, QUrl
 
 from stm32pio.core.log import log_current_exception
 
 from stm32pio.gui.project import ProjectListItem
-from stm32pio.gui.util import Worker
+from stm32pio.gui.util import Worker, WorkerSignals, canonical_path
 from stm32pio.gui.log import module_logger
 import stm32pio.gui.settings
 
@@ -27,10 +27,15 @@ class ProjectsList(QAbstractListModel):
         super().__init__(parent=parent)
 
         self.projects = projects if projects is not None else []
+        # Canonical paths of the added projects for the duplicates lookup (see addListItem). Both the given path and
+        # the one of the initialized project are stored
+        self._paths_index: Dict[str, ProjectListItem] = { project.canonical_path: project for project in self.projects }
+        self._rows: Dict[ProjectListItem, int] = { project: row for row, project in enumerate(self.projects) }
 
         self.workers_pool = QThreadPool(parent=self)
         self.workers_pool.setMaxThreadCount(1)  # only 1 active worker at a time
         self.workers_pool.setExpiryTimeout(-1)  # tasks wait forever for the available spot
+        self._worker_signals = WorkerSignals(parent=self)
 
     def rowCount(self, parent=None, *args, **kwargs):
         return len(self.projects)
@@ -48,48 +53,24 @@ class ProjectsList(QAbstractListModel):
         Get correct projects and save them to Settings. Intended to be run in a thread (as it blocks)
         """
 
-        # Wait for all projects to be initialized, whether successfully or not
-        while any(project.currentAction == 'loading' for project in self.projects):
-            time.sleep(0.1)  # throttle the thread a little bit
+        # Wait for all projects to be initialized, whether successfully or not. The projects added or removed meanwhile
+        # will be handled by the next save (they all go one after another through the single-thread pool)
+        projects = list(self.projects)
+        for project in projects:
+            project.init_done.wait()
 
         # Only correct ones (i.e. inner Stm32pio instance has been successfully constructed)
-        projects_to_save = [project for project in self.projects if project.project is not None]
+        projects_to_save = [project for project in projects if project.project is not None]
 
         settings = stm32pio.gui.settings.global_instance()
-        settings.beginGroup('app')
-        settings.remove('projects')  # clear the current saved list
-        settings.beginWriteArray('projects')
-        for idx, project in enumerate(projects_to_save):
-            settings.setArrayIndex(idx)
-            # This ensures that we always save paths in the pathlib-compatible format
-            settings.setValue('path', str(project.project.path))
-        settings.endArray()
-        settings.endGroup()
+        # This ensures that we always save paths in the pathlib-compatible format
+        settings.set_projects_paths([str(project.project.path) for project in projects_to_save])
 
         module_logger.debug(f"{len(projects_to_save)} projects have been saved to Settings")  # total amount
 
     def saveInSettings(self) -> None:
         """Spawn a thread to wait for all projects and save them in background"""
-        self.workers_pool.start(Worker(self._saveInSettings, logger=module_logger, parent=self))
-
-
-    # TODO: simplify?
-    def each_project_is_duplicate_of(self, path: str) -> Iterator[bool]:
-        """
-        Returns generator yielding an answer to the question "Is current project is a duplicate of one represented by a
-        given path?" for every project in this model, one by one.
-
-        Logic explanation: At a given time some projects (e.g., when we add a bunch of projects, recently added ones)
-        can be not instantiated yet so we cannot extract their project.path property and need to check before comparing.
-        In this case, simply evaluate strings. Also, samefile will even raise, if the given path doesn't exist and
-        that's exactly what we want.
-        """
-        for list_item in self.projects:
-            try:
-                yield (list_item.project is not None and list_item.project.path.samefile(pathlib.Path(path))) or \
-                      path == list_item.name  # simply check strings if a path isn't available
-            except OSError:
-                yield False
+        self.workers_pool.start(Worker(self._saveInSettings, logger=module_logger, signals=self._worker_signals))
 
 
     def addListItem(self, path: str, list_item_kwargs: Mapping[str, Any] = None) -> ProjectListItem:
@@ -101,6 +82,44 @@ class ProjectsList(QAbstractListModel):
             path: path as a string
             list_item_kwargs: keyword arguments passed to the ProjectListItem constructor
         """
+        return self.addListItems([path], list_item_kwargs)[0]
+
+    def addListItems(self, paths: List[str], list_item_kwargs: Mapping[str, Any] = None) -> List[ProjectListItem]:
+        """
+        Same as addListItem() but for the bunch of paths. All new projects are inserted into the model at once so the
+        view is notified (and re-layouts itself) only once.
+
+        Returns:
+            list items corresponding to the given paths (either new or existing ones in case of duplicates)
+        """
+        list_items = []
+        new_projects = []
+        go_to_index = -1
+        for path in paths:
+            list_item, duplicate_index = self._create_list_item(path, list_item_kwargs, new_projects)
+            list_items.append(list_item)
+            if duplicate_index > -1:
+                go_to_index = duplicate_index
+
+        if len(new_projects):
+            self.beginInsertRows(QModelIndex(), self.rowCount(), self.rowCount() + len(new_projects) - 1)
+            self.projects.extend(new_projects)
+            self.endInsertRows()
+            for project in new_projects:
+                # The resolved path of the initialized project can differ from the given one so index it too
+                project.initialized.connect(lambda project=project: self._index_project_path(project))
+
+        if go_to_index > -1:
+            self.goToProject.emit(go_to_index)  # jump to the existing one
+
+        return list_items
+
+    def _create_list_item(self, path: str, list_item_kwargs: Optional[Mapping[str, Any]],
+                          new_projects: List[ProjectListItem]) -> Tuple[ProjectListItem, int]:
+        """
+        Construct a new ProjectListItem and put it to new_projects (not into the model yet) or, if the path is already
+        in the list, return the existing one and its index.
+        """
 
         # Shallow copy, dict makes it mutable
         list_item_kwargs = dict(list_item_kwargs if list_item_kwargs is not None else {})
@@ -109,46 +128,52 @@ class ProjectsList(QAbstractListModel):
         if 'parent' not in list_item_kwargs or not list_item_kwargs['parent']:
             list_item_kwargs['parent'] = self
 
-        duplicate_index = next((idx for idx, is_duplicated in enumerate(self.each_project_is_duplicate_of(path))
-                                if is_duplicated), -1)
-        if duplicate_index > -1:
+        path_key = canonical_path(path)  # symlinks and case are resolved so no need for samefile() checks
+        duplicate = self._paths_index.get(path_key)
+        if duplicate is not None:
             # Just added project is already in the list so abort the addition
             module_logger.warning(f"This project is already in the list: {path}")
 
             # If some parameters were provided, merge them
             proj_params = list_item_kwargs.get('project_kwargs', {}).get('parameters', {})
             if len(proj_params):
-                self.projects[duplicate_index].logger.info(f"updating parameters from the CLI... {proj_params}")
+                duplicate.logger.info(f"updating parameters from the CLI... {proj_params}")
                 # Note: will save stm32pio.ini even if there was not one
-                self.projects[duplicate_index].run('save_config', [proj_params])
+                duplicate.run('save_config', [proj_params])
 
-            self.goToProject.emit(duplicate_index)  # jump to the existing one
-
-            return self.projects[duplicate_index]
+            return duplicate, self._rows[duplicate]
         else:
             # Insert given path into the constructor args (do not use dict.update() as we have list value that we also
-            # want to "merge")
-            if 'project_args' not in list_item_kwargs or len(list_item_kwargs['project_args']) == 0:
-                list_item_kwargs['project_args'] = [path]
-            else:
-                list_item_kwargs['project_args'][0] = path
+            # want to "merge"). The list is copied as the kwargs can be shared by the several paths
+            list_item_kwargs['project_args'] = [path] + list(list_item_kwargs.get('project_args', [])[1:])
 
             # The project is ready to be appended to the model right after the main constructor (wrapper) finished.
             # The underlying Stm32pio class will be initialized soon later in the dedicated thread
             project = ProjectListItem(**list_item_kwargs)
+            self._rows[project] = len(self.projects) + len(new_projects)  # new projects are appended to the tail
+            new_projects.append(project)
+            self._paths_index[path_key] = project
 
-            self.beginInsertRows(QModelIndex(), self.rowCount(), self.rowCount())
-            self.projects.append(project)
-            self.endInsertRows()
+            return project, -1
 
-            return project
+    def _index_project_path(self, project: ProjectListItem) -> None:
+        if project.project is not None and project in self._rows:
+            self._paths_index[project.canonical_path] = project
 
 
     @Slot('QStringList')
     def addProjectsByPaths(self, paths: List[str]):
         """QUrl path (typically is sent from the QML GUI)"""
         if len(paths):
+            local_paths = []
             for path_str in paths:  # convert to strings
+                if path_str.startswith('file:///'):  # the most common case, no need to involve QUrl
+                    path: str = urllib.parse.unquote(path_str[len('file://'):])
+                    if platform.system() == 'Windows':
+                        path = path[1:]  # '/C:/...' -> 'C:/...'
+                    local_paths.append(path)
+                    continue
+
                 path_qurl = QUrl(path_str)
                 if path_qurl.isEmpty():
                     module_logger.warning(f"Given path is empty: {path_str}")
@@ -160,7 +185,8 @@ class ProjectsList(QAbstractListModel):
                 else:
                     module_logger.error(f"Incorrect path: {path_str}")
                     continue
-                self.addListItem(path)
+                local_paths.append(path)
+            self.addListItems(local_paths)
             self.saveInSettings()  # save after all
         else:
             module_logger.warning("No paths were given")
@@ -172,6 +198,11 @@ class ProjectsList(QAbstractListModel):
             self.beginRemoveRows(parent, index, index)
             project = self.projects.pop(index)
             self.endRemoveRows()
+            del self._rows[project]
+            for row in range(index, len(self.projects)):
+                self._rows[self.projects[row]] = row
+            for path_key in [key for key, list_item in self._paths_index.items() if list_item is project]:
+                del self._paths_index[path_key]
         except:
             log_current_exception(module_logger, show_traceback=True)
             return False
@@ -181,6 +212,6 @@ class ProjectsList(QAbstractListModel):
                 self.saveInSettings()
 
             # It allows the project to be deconstructed (i.e. GC'ed) very soon, not at the app shutdown time
-            project.deleteLater()
+            project.close()
 
             return True
@@ -1,12 +1,16 @@
 import collections
 import logging
+import logging.handlers
 import platform
+import queue
 import threading
-from typing import MutableMapping
+import weakref
+from typing import MutableMapping, Dict, Deque, List, Optional, Set
 
-from PySide2.QtCore import QObject, Signal, QThread, QtInfoMsg, QtWarningMsg, QtCriticalMsg, QtFatalMsg, \
+from PySide2.QtCore import QObject, QtDebugMsg, QtInfoMsg, QtWarningMsg, QtCriticalMsg, QtFatalMsg, \
     qInstallMessageHandler
 
+import stm32pio.core.settings
 from stm32pio.core.log import Verbosity, DispatchingFormatter
 
 from stm32pio.gui.util import ProjectID
@@ -14,9 +18,8 @@ from stm32pio.gui.util import ProjectID
 
 def set_verbosity(value: bool):
     """Use this to toggle the verbosity of all loggers at once"""
-    module_logger.setLevel(logging.DEBUG if value else logging.INFO)
-    qml_logger.setLevel(logging.DEBUG if value else logging.INFO)
-    projects_logger.setLevel(logging.DEBUG if value else logging.INFO)
+    level = logging.DEBUG if value else logging.INFO
+    gui_logger.setLevel(level)  # all GUI loggers inherit it (projects share the single one, too)
     _projects_logger_formatter.verbosity = Verbosity.VERBOSE if value else Verbosity.NORMAL
 
 
@@ -25,6 +28,9 @@ def qt_message_handler(mode, context, message):
     Register this logging handler for the Qt stuff if your platform doesn't provide a built-in one or if you want to
     customize it
     """
+    if mode == QtDebugMsg and not qml_logger.isEnabledFor(logging.DEBUG):
+        return  # Qt can be quite chatty so drop them as early as possible (follows the verbosity setting)
+
     if mode == QtInfoMsg:
         mode = logging.INFO
     elif mode == QtWarningMsg:
@@ -38,101 +44,172 @@ def qt_message_handler(mode, context, message):
     qml_logger.log(mode, message)
 
 
-def setup_logging(initial_verbosity):
+def setup_logging(initial_verbosity) -> logging.handlers.QueueListener:
+    """
+    Returns:
+        started QueueListener serving the console loggers, stop it on the app exit to flush the pending records
+    """
+
+    # Console output is performed by the single dedicated thread so the logging calls from the workers don't block on
+    # the I/O. Each real handler filters out the records of the other loggers as they all share the same queue
+    log_queue = queue.Queue()
+    console_handlers = []
+
     module_log_handler = logging.StreamHandler()
     module_log_handler.setFormatter(logging.Formatter("%(levelname)s %(module)s %(funcName)s %(message)s"))
-    module_logger.addHandler(module_log_handler)
-    module_logger.setLevel(logging.INFO)  # set this again later after getting QSettings
+    module_log_handler.addFilter(logging.Filter(module_logger.name))
+    console_handlers.append(module_log_handler)
+    module_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    gui_logger.setLevel(logging.INFO)  # set this again later after getting QSettings
 
     # Apparently Windows version of PySide2 doesn't have QML logging feature turn on so we fill this gap
     if platform.system() == 'Windows':
         qml_log_handler = logging.StreamHandler()
         qml_log_handler.setFormatter(logging.Formatter("[QML] %(levelname)s %(message)s"))
-        qml_logger.addHandler(qml_log_handler)
+        qml_log_handler.addFilter(logging.Filter(qml_logger.name))
+        console_handlers.append(qml_log_handler)
+        qml_logger.addHandler(logging.handlers.QueueHandler(log_queue))
         qInstallMessageHandler(qt_message_handler)
 
+    console_listener = logging.handlers.QueueListener(log_queue, *console_handlers, respect_handler_level=True)
+    console_listener.start()
+
     # Use "singleton" real logger for all projects just wrapping it into the LoggingAdapter for every project
-    projects_logger.setLevel(logging.DEBUG if initial_verbosity else logging.INFO)
     projects_logger_handler.setFormatter(_projects_logger_formatter)
     projects_logger.addHandler(projects_logger_handler)
 
     set_verbosity(initial_verbosity)  # set initial verbosity settings based on the saved state
 
+    return console_listener
+
 
 class BuffersDispatchingHandler(logging.Handler):
     """
-    Every user's project using its own buffer (collections.deque) to store logs. This simple logging.Handler subclass
-    finds and puts an incoming record into the corresponding buffer
+    All the projects share the same logger so this simple logging.Handler subclass just passes an incoming record to
+    the single ProjectsLogDispatcher which knows the project it belongs to
     """
 
-    buffers: MutableMapping[ProjectID, collections.deque] = {}  # the dictionary of projects' ids and theirs buffers
-
     def emit(self, record: logging.LogRecord) -> None:
         if hasattr(record, 'project_id'):
-            # As we exist in the asynchronous environment there is always a risk of some "desynchronization" when the
-            # project (and its buffer) has already been gone but some late message has arrived. Hence, we need to check
-            buffer = self.buffers.get(record.project_id)
-            if buffer is not None:
-                buffer.append(record)
+            try:
+                # Stringify right in the producing thread so the dispatcher thread only routes ready messages
+                record.formatted_message = self.format(record)
+            except Exception:
+                self.handleError(record)
             else:
-                module_logger.warning(f"Logging buffer for the project id {record.project_id} not found. The message "
-                                      f"was:\n{record.msg}")
+                projects_log_dispatcher.put(record)
         else:
             module_logger.warning("LogRecord doesn't have a project_id attribute. Perhaps this is a result of the "
                                   f"logging setup misconfiguration. Anyway, the message was:\n{record.msg}")
 
 
-class LoggingWorker(QObject):
+class ProjectsLogDispatcher:
     """
-    QObject living in a separate QThread, logging everything it receiving. Intended to be an attached
-    ProjectListItem property. Stringifies log records using global BuffersDispatchingHandler instance (its
-    stm32pio.core.util.DispatchingFormatter, to be precise) and passes them via Qt Signal interface so they can be
-    conveniently received by any Qt entity. Also, the level of the message is attaching so the reader can
-    interpret them differently.
-
-    Can be controlled by two threading.Event's:
-        stopped - on activation, leads to thread termination
-        can_flush_log - use this to temporarily save the logs in an internal buffer while waiting for some event to
-            occurs (for example GUI widgets to load), and then flush them when the time has come
+    The single thread delivering the logs of all projects to the corresponding ProjectListItem's (via theirs logsAdded
+    signal so they can be conveniently received by any Qt entity). Log records come already stringified by the global
+    BuffersDispatchingHandler instance (its stm32pio.core.util.DispatchingFormatter, to be precise). Also, the level of
+    the message is attaching so the reader can interpret them differently.
+
+    Records are sent in batches (everything accumulated since the previous send, up to max_batch_size records). Until
+    the project sets its logs_ready flag (for example, waiting for GUI widgets to load) its records are held back here
+    and flushed as soon as the project calls flush().
     """
 
-    sendLog = Signal(str, int)
-
-    def __init__(self, project_id: ProjectID, parent: QObject = None):
-        super().__init__(parent=parent)
-
-        self.project_id = project_id
-        self.buffer = collections.deque()
-        projects_logger_handler.buffers[project_id] = self.buffer  # register our buffer
-
-        self.stopped = threading.Event()
-        self.can_flush_log = threading.Event()
-
-        self.thread = QThread(parent=self)
-        self.moveToThread(self.thread)
-        self.thread.started.connect(self.routine)
-        self.thread.start()
+    max_batch_size = 256
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        # Projects are not kept alive by the dispatcher. Both dictionaries are only accessed from the dispatcher thread
+        # (except the registration)
+        self.projects: MutableMapping[ProjectID, QObject] = weakref.WeakValueDictionary()
+        self._held: Dict[ProjectID, Deque[logging.LogRecord]] = {}
+        self._truncated: Set[ProjectID] = set()  # to warn only once per project
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    def register(self, project_id: ProjectID, project: QObject) -> None:
+        """Subscribe the project to its logs. The thread is started on the first call"""
+        self.projects[project_id] = project
+        with self._thread_lock:
+            if self._thread is None:
+                # Daemonic so it doesn't block the app exit: an idle thread just sleeps on the queue anyway
+                self._thread = threading.Thread(target=self.routine, name='ProjectsLogDispatcher', daemon=True)
+                self._thread.start()
+
+    def put(self, record: logging.LogRecord) -> None:
+        self.queue.put_nowait(record)
+
+    def flush(self, project_id: ProjectID) -> None:
+        """Wake the dispatcher up to send the held back records of the project which has just become ready"""
+        self.queue.put_nowait(project_id)
 
     def routine(self) -> None:
         """
-        The worker constantly querying the buffer on the new log messages availability
+        The thread sleeps until the new log messages are available (no polling so idle projects doesn't consume any
+        CPU time)
         """
-        while not self.stopped.wait(timeout=0.050):
-            if self.can_flush_log.is_set() and len(self.buffer):
-                record = self.buffer.popleft()
-                self.sendLog.emit(projects_logger_handler.format(record), record.levelno)
-        # We do not flush all remaining logs before termination, it can be useful in some other applications though
-        projects_logger_handler.buffers.pop(self.project_id)  # unregister our buffer
-        module_logger.debug(f"exit LoggingWorker of project id {self.project_id}")
-        self.thread.quit()
-
-
+        while True:
+            items = [self.queue.get()]
+            # Take everything that has been accumulated so far (but not too much at once) and send it in batches. Heavy
+            # output (e.g. build) produces lots of records and a signal per every one of them is costly
+            while len(items) < ProjectsLogDispatcher.max_batch_size:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            batches: Dict[ProjectID, List[logging.LogRecord]] = {}
+            for item in items:
+                if isinstance(item, logging.LogRecord):
+                    project_id = item.project_id
+                else:  # flush request
+                    project_id, item = item, None
+
+                # As we exist in the asynchronous environment there is always a risk of some "desynchronization" when
+                # the project has already been gone but some late message has arrived. Hence, we need to check
+                project = self.projects.get(project_id)
+                if project is None:
+                    self._held.pop(project_id, None)
+                    self._truncated.discard(project_id)
+                    if item is not None:
+                        module_logger.warning(f"Project id {project_id} for the log record not found. The message "
+                                              f"was:\n{item.msg}")
+                elif project.logs_ready:
+                    batch = batches.setdefault(project_id, [])
+                    held = self._held.pop(project_id, None)
+                    if held:  # preserve the order
+                        batch.extend(held)
+                    if item is not None:
+                        batch.append(item)
+                elif item is not None:
+                    held = self._held.get(project_id)
+                    if held is None:
+                        held = self._held[project_id] = collections.deque(
+                            maxlen=stm32pio.core.settings.log_buffer_maxlen)
+                    elif len(held) == held.maxlen and project_id not in self._truncated:
+                        self._truncated.add(project_id)
+                        module_logger.warning(f"Too many log records are held back for the project id {project_id}, "
+                                              f"only the last {held.maxlen} will be shown")
+                    held.append(item)
+
+            for project_id, records in batches.items():
+                project = self.projects.get(project_id)
+                if project is None or not records:
+                    continue
+                messages = [[record.formatted_message, record.levelno] for record in records]
+                try:
+                    project.logsAdded.emit(messages)
+                except RuntimeError:  # the underlying C++ object has already been deleted
+                    pass
+
+
+gui_logger = logging.getLogger('stm32pio.gui')  # parent of the loggers below, the level is set here only
 module_logger = logging.getLogger('stm32pio.gui.app')  # use it as a console logger for whatever you want to,
                                                        # typically not related to the concrete project
 qml_logger = logging.getLogger('stm32pio.gui.qml')
 projects_logger = logging.getLogger('stm32pio.gui.projects')
 
-projects_logger_handler = BuffersDispatchingHandler()  # a storage of the buffers for the logging messages of all
-                                                       # current projects (see its docs for more info)
+projects_logger_handler = BuffersDispatchingHandler()
+projects_log_dispatcher = ProjectsLogDispatcher()  # the single thread serving the logs of all the current projects
 
 _projects_logger_formatter = DispatchingFormatter()
@@ -1,17 +1,21 @@
+import collections
 import logging
 import threading
-import weakref
-from typing import List, Mapping, Any, Optional
+from typing import List, Mapping, Any, Optional, Callable
 
-from PySide2.QtCore import QObject, Signal, QThreadPool, Property, Slot
+from PySide2.QtCore import QObject, Signal, Property, Slot
 
 import stm32pio.core.log
 import stm32pio.core.project
 import stm32pio.core.state
 import stm32pio.core.settings
 
-from stm32pio.gui.log import LoggingWorker, module_logger
-from stm32pio.gui.util import Worker
+from stm32pio.gui.log import projects_log_dispatcher, module_logger
+from stm32pio.gui.util import Worker, WorkerSignals, workers_pool, canonical_path
+
+
+# ProjectState items always follow the ProjectStage order so we can pair the values with the precomputed names
+_stages_names = [stage.name for stage in stm32pio.core.state.ProjectStage]
 
 
 class ProjectListItem(QObject):
@@ -19,7 +23,12 @@ class ProjectListItem(QObject):
     The core functionality class - the wrapper around the Stm32pio class suitable for the project GUI representation
     """
 
+    # Stm32pio methods the front-end can invoke via run()
+    allowed_actions = ('save_config', 'inspect_ioc_config', 'generate_code', 'pio_init', 'patch', 'build', 'clean',
+                       'start_editor')
+
     logAdded = Signal(str, int, arguments=['message', 'level'])  # send the log message to the front-end
+    logsAdded = Signal('QVariantList', arguments=['messages'])  # same for the batch of [message, level] pairs
     initialized = Signal()
     destructed = Signal()
 
@@ -27,9 +36,9 @@ class ProjectListItem(QObject):
                  from_startup: bool = False, parent: QObject = None):
         """
         Instance construction is split into 2 phases: the wrapper setup and inner Stm32pio class initialization. The
-        latter one is taken out to the separated thread as it is, potentially, a time-consuming operation. This thread
-        starts right after the main constructor so the wrapper is already built at that moment and therefore can be used
-        from GUI, be referenced and so on.
+        latter one is taken out to the thread pool as it is, potentially, a time-consuming operation. It is scheduled
+        right in the main constructor so the wrapper is already built at that moment and therefore can be used from GUI,
+        be referenced and so on.
 
         Args:
             project_args: list of positional arguments that will be passed to the Stm32pio constructor
@@ -50,42 +59,54 @@ class ProjectListItem(QObject):
 
         underlying_logger = logging.getLogger('stm32pio.gui.projects')
         self.logger = stm32pio.core.log.ProjectLogger(underlying_logger, project_id=id(self))
-        self.logging_worker = LoggingWorker(project_id=id(self))
-        self.logging_worker.sendLog.connect(self.logAdded)
-
-        # QThreadPool can automatically queue new incoming tasks if a number of them are larger than maxThreadCount
-        self.workers_pool = QThreadPool(parent=self)
-        self.workers_pool.setMaxThreadCount(1)
-        self.workers_pool.setExpiryTimeout(-1)  # tasks wait forever for the available spot
+        # The logs are delivered via logsAdded by the shared dispatcher thread, held back until the GUI is ready
+        self.logs_ready = False
+        projects_log_dispatcher.register(id(self), self)
+
+        # Actions of the project should be executed one after another so we queue them here and pass to the shared
+        # app QThreadPool one at a time (rather than keeping a dedicated 1-thread pool (and so a parked OS thread)
+        # for every project)
+        self._pending_workers = collections.deque()
+        self._worker_busy = False
+        self._closing = False  # see close()
+        # All the actions report through the same signals so we connect them only once
+        self._action_signals = WorkerSignals(parent=self)
+        self._action_signals.started.connect(self.actionStartedSlot)
+        self._action_signals.finished.connect(self.actionFinishedSlot)
+        self._action_signals.finished.connect(self.updateState)  # emits stateChanged and currentStageChanged itself
 
         self._current_action: str = 'loading'
         self._last_action_succeed: bool = True
 
         # These values are valid only until the Stm32pio project initialize itself (or failed to) (see init_project)
         self.project: Optional[stm32pio.core.project.Stm32pio] = None
+        self._actions: Mapping[str, Callable] = {}  # action name -> bound Stm32pio method, see init_project
         # Use a project path string (as it should be a first argument) as a name
         self._name = str(project_args[0]) if len(project_args) else 'Undefined'
+        # Used by ProjectsList to detect the duplicates. Points to the resolved project folder after the initialization
+        self.canonical_path: str = canonical_path(self._name)
         self._state = { 'LOADING': True }  # pseudo-stage (not present in the ProjectStage enum but is used from QML)
         self._current_stage = 'LOADING'
+        self._config: Optional[dict] = None  # see the config property
 
-        self.qml_ready = threading.Event()  # the front and the back both should know when each other is initialized
-        self.should_be_destroyed = threading.Event()  # currently, is used just to "cancel" the initialization thread
-
-        # Register some kind of the deconstruction handler (later, after the project initialization, see init_project)
-        self._finalizer = None
+        self.init_done = threading.Event()  # set at the end of init_project, can be waited from any thread
+        self._init_finished = False  # the front and the back both should know when each other is initialized...
+        self._qml_ready = False
+        self._initialized_notified = False  # ...so the GUI is notified once both are ready (see _notify_initialized)
 
         if 'logger' not in project_kwargs:
             project_kwargs['logger'] = self.logger
 
-        # Start the Stm32pio part initialization right after. It can take some time so we schedule it in a dedicated
-        # thread
-        init_thread = threading.Thread(target=self.init_project, args=project_args, kwargs=project_kwargs)
-        init_thread.start()
+        # Start the Stm32pio part initialization right after. It can take some time so we schedule it as the first job
+        # of the project's queue
+        init_signals = WorkerSignals(parent=self)
+        init_signals.finished.connect(self.initFinishedSlot)
+        self._enqueue_worker(Worker(self.init_project, project_args, signals=init_signals, kwargs=project_kwargs))
 
 
     def init_project(self, *args, **kwargs) -> None:
         """
-        Initialize the underlying Stm32pio project.
+        Initialize the underlying Stm32pio project. Runs in a worker thread.
 
         Args:
             *args: positional arguments of the Stm32pio constructor
@@ -98,67 +119,77 @@ class ProjectListItem(QObject):
             self._state = { 'INIT_ERROR': True }  # pseudo-stage
             self._current_stage = 'INIT_ERROR'
         else:
+            self._actions = { action: getattr(self.project, action) for action in self.allowed_actions }
+            self.canonical_path = canonical_path(str(self.project.path))
             if self.project.config.get('project', 'inspect_ioc').lower() in stm32pio.core.settings.yes_options and \
                self.project.state.current_stage > stm32pio.core.state.ProjectStage.EMPTY:
                 self.project.inspect_ioc_config()
+            self._refresh_state()  # do it here rather than in the main thread
         finally:
-            # Register some kind of the deconstruction handler
-            self._finalizer = weakref.finalize(self, self.at_exit, self.workers_pool, self.logging_worker,
-                                               self.name if self.project is None else str(self.project))
-            self._current_action = ''
-
-            # Wait for the GUI to initialize (which one is earlier, actually, back or front)
-            while not self.qml_ready.wait(timeout=0.050):
-                # When item is located out of visible scope then QML doesn't load its visual representation so this
-                # initialization thread is kept hanging. This is OK except when the app shutting down, it prevents
-                # Python GC of calling weakref for finalization process. So we introduce additional flag to be able
-                # to quit the thread
-                if self.should_be_destroyed.is_set():
-                    break
-
-            if not self.should_be_destroyed.is_set():
-                self.updateState()
-                self.initialized.emit()
-                self.nameChanged.emit()  # in any case we should notify the GUI part about the initialization ending
-
-
-    @staticmethod
-    def at_exit(workers_pool: QThreadPool, logging_worker: LoggingWorker, name: str):
+            self.init_done.set()
+
+    @Slot(str, bool)
+    def initFinishedSlot(self, action: str, success: bool):
+        """Called in the main thread when the init_project has been done (successfully or not)"""
+        self._current_action = ''
+        self.currentActionChanged.emit()
+        self._init_finished = True
+        self._worker_busy = False
+        self._dispatch_next_worker()
+        self._notify_initialized()
+
+    def _notify_initialized(self):
+        """Inform the GUI part about the initialization ending as soon as both the back and the front are ready"""
+        if self._init_finished and self._qml_ready and not self._initialized_notified:
+            self._initialized_notified = True
+            self.stateChanged.emit()
+            self.currentStageChanged.emit()
+            self.initialized.emit()
+            self.nameChanged.emit()  # in any case we should notify the GUI part about the initialization ending
+
+
+    @Slot()
+    def close(self):
         """
-        The instance deconstruction handler is meant to be used with weakref.finalize() conforming with the requirement
-        to have no reference to the target object (so it doesn't contain any instance reference and also is decorated as
-        'staticmethod')
+        Use this instead of deleteLater() to dispose the project. Cancels the queued actions and schedules the deletion
+        as soon as the currently running one (if any) has finished. Never blocks
         """
-        # Wait forever for all the jobs to complete. Currently, we cannot abort them gracefully
-        workers_pool.waitForDone(msecs=-1)
-        logging_worker.stopped.set()  # post the event in the logging worker to inform it...
-        logging_worker.thread.wait()  # ...and wait for it to exit, too
-        module_logger.debug(f"destroyed {name}")
-
-    def deleteLater(self) -> None:
+        if self._closing:
+            return
+        self._closing = True
+        self._pending_workers.clear()
         self.destructed.emit()
-        return super().deleteLater()
+        self._dispatch_next_worker()  # deletes right away if idle, otherwise the finished slot will call it again
 
     @Slot()
     def qmlLoaded(self):
         """Event signaling the complete loading of the needed frontend components"""
-        self.qml_ready.set()
-        self.logging_worker.can_flush_log.set()
+        self._qml_ready = True
+        self.logs_ready = True
+        projects_log_dispatcher.flush(id(self))
+        self._notify_initialized()
 
-    @Property(bool)
+    @Property(bool, constant=True)
     def fromStartup(self) -> bool:
         """Is this project is here from the beginning of the app life?"""
         return self._from_startup
 
-    @Property('QVariant')
+    configChanged = Signal()
+    @Property('QVariant', notify=configChanged)
     def config(self) -> dict:
-        """Inner project's ConfigParser config converted to the dictionary (QML JS object)"""
-        # TODO: cache this? (related to live-reloaded settings...)
-        return {
-            section: {
-                key: value for key, value in self.project.config.items(section)
-            } if self.project is not None else {} for section in ['app', 'project']
-        }
+        """
+        Inner project's ConfigParser config converted to the dictionary (QML JS object). This is a cached value, it is
+        reset after the actions that can alter the config (see actionFinishedSlot())
+        """
+        if self.project is None:
+            return { section: {} for section in ['app', 'project'] }
+        if self._config is None:
+            self._config = {
+                section: {
+                    key: value for key, value in self.project.config.items(section)
+                } for section in ['app', 'project']
+            }
+        return self._config
 
     nameChanged = Signal()
     @Property(str, notify=nameChanged)
@@ -173,18 +204,21 @@ class ProjectListItem(QObject):
     @Property('QVariant', notify=stateChanged)
     def state(self) -> dict:
         """
-        Get the current project state in the appropriate Qt form. Update the cached 'current stage' value as a side
-        effect
+        Get the current project state in the appropriate Qt form. This is a cached value (QML can request it many times
+        during the bindings evaluation), use updateState() to refresh it
         """
-        if type(self._state) == stm32pio.core.state.ProjectState:
-            return { stage.name: value for stage, value in self._state.items() }
-        else:
-            return self._state
+        return self._state
+
+    def _refresh_state(self):
+        """Evaluate the project state (involves some file system operations) and cache the result"""
+        if self.project is not None:
+            project_state = self.project.state
+            self._state = dict(zip(_stages_names, project_state.values()))
+            self._current_stage = project_state.current_stage.name
 
     @Slot()
     def updateState(self):
-        if self.project is not None:
-            self._state = self.project.state
+        self._refresh_state()
         self.stateChanged.emit()
         self.currentStageChanged.emit()
 
@@ -193,14 +227,12 @@ class ProjectListItem(QObject):
     def currentStage(self) -> str:
         """
         Get the current stage the project resides in.
-        Note: this returns a cached value. Cache updates every time the state property got requested
+        Note: this returns a cached value. Cache updates every time the state is updated (see updateState())
         """
-        if type(self._state) == stm32pio.core.state.ProjectState:
-            return self._state.current_stage.name
-        else:
-            return self._current_stage
+        return self._current_stage
 
-    @Property(str)
+    currentActionChanged = Signal()
+    @Property(str, notify=currentActionChanged)
     def currentAction(self) -> str:
         """
         Stm32pio action (i.e. function name) that is currently executing or an empty string if there is none. It is set
@@ -221,6 +253,7 @@ class ProjectListItem(QObject):
         # when the signal will be handled in StateMachine) (probably, should be resolved later as it is bad to be bound
         # to such a specific logic)
         self._current_action = action
+        self.currentActionChanged.emit()
         self.actionStarted.emit(action)
 
     actionFinished = Signal(str, bool, arguments=['action', 'success'])
@@ -228,14 +261,20 @@ class ProjectListItem(QObject):
     def actionFinishedSlot(self, action: str, success: bool):
         """Pass the corresponding signal from the worker, perform related tasks"""
         self._last_action_succeed = success
+        self._worker_busy = False
         if not success:
             # Clear the queue - stop further execution (cancel planned tasks if an error had happened)
-            self.workers_pool.clear()
+            self._pending_workers.clear()
+        self._dispatch_next_worker()
+        if action == 'save_config' or (success and action in ('generate_code', 'pio_init')):
+            self._config = None
+            self.configChanged.emit()
         self.actionFinished.emit(action, success)
         # Currently, this property should be reset AFTER emitting the 'actionFinished' signal (because QML will query it
         # when the signal will be handled in StateMachine) (probably, should be resolved later as it is bad to be bound
         # to such a specific logic)
         self._current_action = ''
+        self.currentActionChanged.emit()
 
 
     @Slot(str, 'QVariantList')
@@ -248,10 +287,37 @@ class ProjectListItem(QObject):
             args: list of positional arguments for this action
         """
 
-        worker = Worker(getattr(self.project, action), args, self.logger, parent=self)
-        worker.started.connect(self.actionStartedSlot)
-        worker.finished.connect(self.actionFinishedSlot)
-        worker.finished.connect(self.updateState)
-        worker.finished.connect(self.currentStageChanged)
-
-        self.workers_pool.start(worker)  # will automatically place to the queue
+        func = self._actions.get(action)
+        if func is None:
+            if action not in self.allowed_actions or self.init_done.is_set():
+                self.logger.error(f"cannot run '{action}': no such action or the project is not initialized")
+                return
+
+            # The project is still loading. init_project is the first worker in the queue so look the action up when
+            # this one is actually started, i.e. after the initialization
+            def func(*action_args):
+                if action not in self._actions:
+                    self.logger.error(f"cannot run '{action}': the project is not initialized")
+                    return -1
+                return self._actions[action](*action_args)
+
+        worker = Worker(func, args, self.logger, signals=self._action_signals)
+        worker.name = action  # the front-end distinguishes the actions by their names
+        self._enqueue_worker(worker)
+
+    def _enqueue_worker(self, worker: Worker):
+        """Place the worker to the project's queue"""
+        self._pending_workers.append(worker)
+        self._dispatch_next_worker()
+
+    def _dispatch_next_worker(self):
+        """Start the next queued action, if any, unless the previous one is still running"""
+        if self._closing:
+            if not self._worker_busy:
+                # Nothing uses our signals anymore so it is safe now
+                super().deleteLater()
+                module_logger.debug(f"destroyed {self._name}")
+            return
+        if not self._worker_busy and len(self._pending_workers):
+            self._worker_busy = True
+            workers_pool().start(self._pending_workers.popleft())
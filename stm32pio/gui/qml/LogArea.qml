@@ -16,16 +16,27 @@ Rectangle {
             font.pointSize: 10  // different on different platforms, Qt's bug
             font.weight: Font.DemiBold
             textFormat: TextEdit.RichText
+            function format(message, level) {
+                if (level === Logging.WARNING) {
+                    return '<font color="goldenrod"><pre style="white-space: pre-wrap">' + message + '</pre></font>';
+                } else if (level >= Logging.ERROR) {
+                    return '<font color="indianred"><pre style="white-space: pre-wrap">' + message + '</pre></font>';
+                } else {
+                    return '<pre style="white-space: pre-wrap">' + message + '</pre>';
+                }
+            }
             Connections {
                 target: project
                 function onLogAdded(message, level) {
-                    if (level === Logging.WARNING) {
-                        log.append('<font color="goldenrod"><pre style="white-space: pre-wrap">' + message + '</pre></font>');
-                    } else if (level >= Logging.ERROR) {
-                        log.append('<font color="indianred"><pre style="white-space: pre-wrap">' + message + '</pre></font>');
-                    } else {
-                        log.append('<pre style="white-space: pre-wrap">' + message + '</pre>');
+                    log.append(log.format(message, level));
+                }
+                function onLogsAdded(messages) {
+                    // Append the whole batch at once so the text layout is performed only one time
+                    let html = '';
+                    for (let i = 0; i < messages.length; i++) {
+                        html += log.format(messages[i][0], messages[i][1]);
                     }
+                    log.append(html);
                 }
             }
         }
@@ -1,5 +1,6 @@
+import contextlib
 import logging
-from typing import Mapping, Any, List, Callable
+from typing import Mapping, Any, List, Callable, Iterator
 import warnings
 
 from PySide2.QtCore import QSettings, Slot
@@ -7,6 +8,29 @@ from PySide2.QtCore import QSettings, Slot
 import stm32pio.gui.log
 
 
+_bool_strings = { 'false': False, 'true': True }  # see Settings.get()
+
+
+@contextlib.contextmanager
+def qs_group(settings: QSettings, name: str) -> Iterator[None]:
+    """QSettings.beginGroup()/endGroup() pair that is always closed (so the following calls don't use a wrong group)"""
+    settings.beginGroup(name)
+    try:
+        yield
+    finally:
+        settings.endGroup()
+
+
+@contextlib.contextmanager
+def qs_read_array(settings: QSettings, name: str) -> Iterator[int]:
+    """QSettings.beginReadArray()/endArray() pair that is always closed. Yields the array size"""
+    size = settings.beginReadArray(name)
+    try:
+        yield size
+    finally:
+        settings.endArray()
+
+
 class Settings(QSettings):
     """
     Extend the class by useful get/set methods allowing to avoid redundant code lines and also are callable from the
@@ -44,6 +68,8 @@ class Settings(QSettings):
         self.prefix = prefix
         defaults = defaults if defaults is not None else Settings.DEFAULTS
         self.external_triggers = external_triggers if external_triggers is not None else {}
+        # These are read with the explicit type so QSettings itself converts the stored strings
+        self._bool_keys = { key for key, value in defaults.items() if isinstance(value, bool) }
 
         for key, value in defaults.items():
             if not self.contains(self.prefix + key):
@@ -55,20 +81,51 @@ class Settings(QSettings):
 
     @Slot(str, result='QVariant')
     def get(self, key):
+        if key in self._bool_keys:
+            return self.value(self.prefix + key, type=bool)
+
         value = self.value(self.prefix + key)
         # On case insensitive backends 'False' is saved as 'false' so we need to workaround this
-        if value == 'false':
-            value = False
-        elif value == 'true':
-            value = True
+        if isinstance(value, str):
+            return _bool_strings.get(value, value)
         return value
 
+    # The projects list is stored outside the prefix
+    PROJECTS_PATHS_KEY = 'app/projects_paths'
+    LEGACY_PROJECTS_ARRAY_KEY = 'app/projects'  # QSettings array of the previous versions, migrated on the first save
+
+    def get_projects_paths(self) -> List[str]:
+        """Restore the saved projects list (see set_projects_paths())"""
+        if self.contains(Settings.PROJECTS_PATHS_KEY):
+            return self.value(Settings.PROJECTS_PATHS_KEY, [], type=list)
+
+        # Fallback to the array format used by the previous versions
+        paths = []
+        with qs_group(self, 'app'), qs_read_array(self, 'projects') as size:
+            for index in range(size):
+                self.setArrayIndex(index)
+                paths.append(self.value('path'))
+        return paths
+
+    def set_projects_paths(self, paths: List[str]) -> None:
+        """Save the projects list as a single value (so it is written at once instead of an array entry by entry)"""
+        if self.contains(Settings.PROJECTS_PATHS_KEY) and \
+           self.value(Settings.PROJECTS_PATHS_KEY, [], type=list) == paths:
+            return  # e.g. the list just restored at startup, don't rewrite the storage
+        self.setValue(Settings.PROJECTS_PATHS_KEY, paths)
+        if self.contains(Settings.LEGACY_PROJECTS_ARRAY_KEY + '/size'):
+            self.remove(Settings.LEGACY_PROJECTS_ARRAY_KEY)  # the new key is read from now on, no need to keep it
+
     @Slot(str, 'QVariant')
     def set(self, key, value):
+        if self.get(key) == value:
+            return  # QML can set the same value again on bindings re-evaluation, don't write it and fire triggers
+
         self.setValue(self.prefix + key, value)
 
-        if key in self.external_triggers.keys():
-            self.external_triggers[key](value)
+        trigger = self.external_triggers.get(key)
+        if trigger is not None:
+            trigger(value)
 
 
 _settings = None
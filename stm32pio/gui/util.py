@@ -1,8 +1,9 @@
 import logging
-import time
-from typing import Callable, List, Any, Optional
+import os
+from typing import Callable, List, Any, Optional, Mapping
+import warnings
 
-from PySide2.QtCore import QObject, QRunnable, Signal
+from PySide2.QtCore import QObject, QRunnable, Signal, QThreadPool
 
 import stm32pio.core.log
 
@@ -10,55 +11,88 @@ import stm32pio.core.log
 ProjectID = type(id(object))  # Int
 
 
-class Worker(QObject, QRunnable):
+class WorkerSignals(QObject):
     """
-    Generic worker for asynchronous processes: QObject + QRunnable combination. First allows to attach Qt signals,
-    second is compatible with the QThreadPool
+    Qt signals of the Worker. QRunnable is not a QObject so they are placed in a separate object. The same instance can
+    be shared by many workers (e.g. by all the actions of a single project) so the connections are made only once
     """
 
     started = Signal(str, arguments=['action'])
     finished = Signal(str, bool, arguments=['action', 'success'])
 
 
-    def __init__(self, func: Callable[[List[Any]], Optional[int]], args: List[Any] = None,
-                 logger: logging.Logger = None, parent: QObject = None):
+class Worker(QRunnable):
+    """
+    Generic worker for asynchronous processes compatible with the QThreadPool. Reports about itself via WorkerSignals
+    """
+
+    def __init__(self, func: Callable[..., Optional[int]], args: List[Any] = None,
+                 logger: logging.Logger = None, signals: WorkerSignals = None, kwargs: Mapping[str, Any] = None):
         """
         Args:
             func: function to run. It should return 0 or None for the call to be considered successful
             args: the list of positional arguments. They will be unpacked and passed to the function
+            kwargs: the mapping of keyword arguments. They will be unpacked and passed to the function
             logger: optional logger to report about the occurred exception
-            parent: Qt object
+            signals: WorkerSignals instance to notify through. The caller is responsible for keeping it alive (e.g. by
+                parenting). If not given, a new one will be created
         """
-        QObject.__init__(self, parent=parent)
-        QRunnable.__init__(self)
+        super().__init__()
 
         self.func = func
         self.args = args if args is not None else []
+        self.kwargs = kwargs if kwargs is not None else {}
         self.logger = logger
+        self.signals = signals if signals is not None else WorkerSignals()
         self.name = func.__name__
 
 
     def run(self):
-        self.started.emit(self.name)  # notify the caller
+        self.signals.started.emit(self.name)  # notify the caller
 
         try:
-            result = self.func(*self.args)
+            result = self.func(*self.args, **self.kwargs)
         except Exception:
             if self.logger is not None:
                 # We cannot pass the project config here to preserve the error because we don't have the reference
                 stm32pio.core.log.log_current_exception(self.logger)
             result = -1
 
-        if result is None or (type(result) == int and result == 0):
-            success = True
-        else:
-            success = False
+        success = result is None or result == 0
+
+        # The caller decides whether to proceed with the next tasks or not. It is responsible for the queueing itself
+        # (see ProjectListItem) so the thread shouldn't be held here
+        self.signals.finished.emit(self.name, success)  # notify the caller
+
+
+_workers_pool: Optional[QThreadPool] = None
+
+
+def init_workers_pool(app) -> QThreadPool:
+    """Create the thread pool shared by all the app workers (projects actions, start-up loading, etc.)"""
+    global _workers_pool
+
+    if _workers_pool is not None:
+        warnings.warn("Workers pool is already initialized. Use workers_pool() to retrieve the instance",
+                      category=ResourceWarning)
+        return _workers_pool
+
+    _workers_pool = QThreadPool(parent=app)
+    # Several projects can be busy at the same time so don't limit them to the (possibly small) ideal threads count
+    _workers_pool.setMaxThreadCount(max(4, os.cpu_count() or 4))
+    _workers_pool.setExpiryTimeout(-1)  # keep the spawned threads for the next workers
+
+    return _workers_pool
+
+
+def canonical_path(path: str) -> str:
+    """Normalized form of the path so the paths can be compared as plain strings (symlinks and case are resolved)"""
+    return os.path.normcase(os.path.realpath(path))
 
-        self.finished.emit(self.name, success)  # notify the caller
 
-        if not success:
-            # Pause the thread and, therefore, the parent QThreadPool queue so the caller can decide whether we should
-            # proceed or stop. This should not cause any problems as we've already perform all necessary tasks and this
-            # just delaying the QRunnable removal from the pool
-            # TODO: looks like a hack...
-            time.sleep(1.0)
+def workers_pool() -> QThreadPool:
+    if _workers_pool is None:
+        warnings.warn("Workers pool is not initialized. Call init_workers_pool() first. Using the global Qt pool",
+                      category=ResourceWarning)
+        return QThreadPool.globalInstance()
+    return _workers_pool
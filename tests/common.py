@@ -15,8 +15,16 @@ To get the test coverage install and use 'coverage' package:
 This will not cover subprocess calls, though. To get them covered too, use pytest and its pytest-cov plugin
     $  pip install pytest pytest-cov
     $  pytest --cov=stm32pio --cov-branch --cov-report=html
+
+Tests can be run in parallel using pytest-xdist plugin (every worker process gets its own TEMP_DIR). Keep the test
+files whole on a worker so the tests of a file can reuse the cache of generate_and_pio_init(). test_start_editor
+inspects all the system processes so it should be run alone (see CI/tests_runner.py):
+    $  pip install pytest-xdist
+    $  pytest -n auto --dist loadfile --deselect tests/test_unit.py::TestUnit::test_start_editor
+    $  pytest tests/test_unit.py::TestUnit::test_start_editor
 """
 
+import hashlib
 import inspect
 import os
 import shutil
@@ -80,5 +88,36 @@ class CustomTestCase(unittest.TestCase):
         shutil.rmtree(STAGE_PATH, ignore_errors=True)
 
 
+# Lives in TEMP_DIR so it is removed at the end of the test session and is private to the test worker process (no
+# stale entries or races between the workers). The flip side is that every worker fills its own cache, so run the tests
+# using it on the same worker (pytest-xdist '--dist loadfile', they all are in test_integration.py)
+INITIALIZED_PROJECTS_CACHE = Path(TEMP_DIR.name).joinpath('initialized-projects-cache')
+
+
+def generate_and_pio_init(project) -> None:
+    """
+    Bring the STAGE_PATH project to the "code generated + PlatformIO initialized" state. Running CubeMX and PlatformIO
+    takes a while, and the results are the same for the same inputs, so the resulting tree is cached for the test
+    session (keyed by the .ioc file content, the board and the CubeMX command) and just copied on the subsequent calls.
+    Use it for the tests that need such a project as a starting point rather than test the actions themselves
+
+    Args:
+        project: stm32pio.core.project.Stm32pio instance located at STAGE_PATH
+    """
+    key = hashlib.sha256()
+    key.update(STAGE_PATH.joinpath(PROJECT_IOC_FILENAME).read_bytes())
+    for part in [project.config.get('project', 'board'), project.config.get('app', 'cubemx_cmd')]:
+        key.update(str(part).encode())
+    cached_tree = INITIALIZED_PROJECTS_CACHE.joinpath(key.hexdigest())
+
+    if not cached_tree.exists():
+        if project.generate_code() != 0 or project.pio_init() != 0:
+            return  # don't cache a broken tree, let the test deal with it
+        shutil.copytree(STAGE_PATH, cached_tree)
+    else:
+        shutil.rmtree(STAGE_PATH)
+        shutil.copytree(cached_tree, STAGE_PATH)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -86,8 +86,7 @@ class TestIntegration(CustomTestCase):
         Initialize a new project and try to build it
         """
         project = stm32pio.core.project.Stm32pio(STAGE_PATH, parameters={'project': {'board': PROJECT_BOARD}})
-        project.generate_code()
-        project.pio_init()
+        generate_and_pio_init(project)
         project.patch()
 
         self.assertEqual(project.build(), 0, msg="Build failed")
@@ -100,8 +99,7 @@ class TestIntegration(CustomTestCase):
         project = stm32pio.core.project.Stm32pio(STAGE_PATH, parameters={'project': {'board': PROJECT_BOARD}})
 
         # Generate a new project ...
-        project.generate_code()
-        project.pio_init()
+        generate_and_pio_init(project)
         project.patch()
 
         # ... change it:
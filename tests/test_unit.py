@@ -238,6 +238,20 @@ class TestUnit(CustomTestCase):
         self.assertGreater(len(boards), 0, msg="boards list is empty")
         self.assertTrue(all(isinstance(item, str) for item in boards), msg="some list items are not strings")
 
+    def test_get_platformio_boards_cached(self):
+        """
+        Sequential requests should be served from the cache without spawning PlatformIO again (separately for every
+        PlatformIO command)
+        """
+        fake_output = subprocess.CompletedProcess(args=[], returncode=0, stdout=b'[{"id": "nucleo_f031k6"}]')
+        with unittest.mock.patch('subprocess.run', return_value=fake_output) as run_mock:
+            boards = stm32pio.core.pio.get_boards('test_pio_cmd')
+            self.assertEqual(stm32pio.core.pio.get_boards('test_pio_cmd'), boards)
+            self.assertEqual(run_mock.call_count, 1, msg="boards list hasn't been cached")
+            stm32pio.core.pio.get_boards('another_test_pio_cmd')
+            self.assertEqual(run_mock.call_count, 2, msg="different commands share the same cache")
+        self.assertEqual(boards, ['nucleo_f031k6'])
+
     def test_ioc_file_provided(self):
         """
         Test a correct handling of a case when the .ioc file was specified instead of the containing directory